@@ -1,4 +1,10 @@
 import json
+from operator import itemgetter
+
+try:
+    import orjson  # optional, C-backed parse/serialize
+except ImportError:
+    orjson = None
 
 in_path = "slim_sorted.json"
 out_path = "slim_sorted_by_first_part.json"
@@ -12,29 +18,36 @@ def extract_first_part(name):
     # Split by underscore and take the first segment
     return name.split("_")[0].strip() if name else ""
 
-with open(in_path, "r", encoding="utf-8") as f:
-    data = json.load(f)
+if orjson is not None:
+    with open(in_path, "rb") as f:
+        data = orjson.loads(f.read())
+else:
+    with open(in_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
 
-# Convert dict to list to ensure stable sorting
+# Lightweight tuples instead of per-row dicts: the sort key is the
+# tuple prefix, so a plain rows.sort() orders by first part
+# (case-insensitive), then full name, then ID
 rows = []
 for _id, rec in data.items():
     name = rec.get("name")
+    if isinstance(name, list):
+        name = name[0] if name else ""
+    if not isinstance(name, str):
+        name = str(name) if name else ""
     first_part = extract_first_part(name)
-    rows.append({
-        "id": _id,
-        "name": name if not isinstance(name, list) else (name[0] if name else ""),
-        "first_part": first_part,
-        "layer": rec.get("layer"),
-        "txt": rec.get("txt")
-    })
-
-# Sort by first part (case-insensitive), then full name, then ID
-rows.sort(key=lambda r: (r["first_part"].lower(), r["name"].lower(), r["id"]))
-
-# If you want to convert back to dict with IDs as keys:
-sorted_dict = {r["id"]: {"name": r["name"], "layer": r["layer"], "txt": r["txt"]} for r in rows}
-
-with open(out_path, "w", encoding="utf-8") as f:
-    json.dump(sorted_dict, f, ensure_ascii=False, indent=2)
+    rows.append((first_part.lower(), name.lower(), _id, name, rec.get("layer"), rec.get("txt")))
+
+rows.sort(key=itemgetter(0, 1, 2))
+
+# Convert back to dict with IDs as keys:
+sorted_dict = {r[2]: {"name": r[3], "layer": r[4], "txt": r[5]} for r in rows}
+
+if orjson is not None:
+    with open(out_path, "wb") as f:
+        f.write(orjson.dumps(sorted_dict, option=orjson.OPT_INDENT_2))
+else:
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(sorted_dict, f, ensure_ascii=False, indent=2)
 
 print(f"✅ Sorted by first part of name — saved to {out_path}")
@@ -3,18 +3,64 @@
 
 import json
 import argparse
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+try:
+    import ijson  # optional, keeps peak memory at O(one element)
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # optional, C-backed parse/serialize
+except ImportError:
+    orjson = None
+
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def iter_elements(in_path: str):
+    """Yield (element_id, element_data) pairs from the input JSON.
+
+    Streams with ijson when available so the whole file is never
+    materialized; falls back to a one-shot parse otherwise.
+    """
+    if ijson is not None:
+        with open(in_path, 'rb') as f:
+            yield from ijson.kvitems(f, '')
+    else:
+        with open(in_path, 'rb') as f:
+            yield from _loads(f.read()).items()
+
 
 def group_by_group_id(in_path: str, out_path: str = None):
-    # Load JSON file
-    with open(in_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Summary-only mode: just count group sizes, never build the groups
+    if not out_path:
+        counts = Counter()
+        for element_id, element_data in iter_elements(in_path):
+            gid = element_data.get('group_id')
+            if not gid:
+                gid = "__NO_GROUP_ID__"  # mark missing ones
+            counts[gid] += 1
+        print(f"✅ Found {len(counts)} unique group_id values")
+        for gid in sorted(counts):
+            print(f"{gid}: {counts[gid]} elements")
+        print(list(counts))
+        return counts
 
-    # Prepare grouping dict
+    # Prepare grouping dict, filled while streaming the input
     grouped = defaultdict(list)
 
-    elems = []
-    for element_id, element_data in data.items():
+    for element_id, element_data in iter_elements(in_path):
         gid = element_data.get('group_id')
         if not gid:
             gid = "__NO_GROUP_ID__"  # mark missing ones
@@ -22,22 +68,26 @@ def group_by_group_id(in_path: str, out_path: str = None):
             "id": element_id,
             **element_data
         })
-        if gid not in elems:
-            elems.append(gid)
+
+    # defaultdict keys are already unique and in first-seen order
+    elems = list(grouped)
 
     # Sort dictionary by group_id name for readability
     grouped_sorted = dict(sorted(grouped.items(), key=lambda x: x[0]))
 
-    # Optionally save output to file
-    if out_path:
-        with open(out_path, 'w', encoding='utf-8') as f:
-            json.dump(grouped_sorted, f, ensure_ascii=False, indent=2)
-        print(f"✅ Grouped output saved to: {out_path}")
-    else:
-        # Just print summary
-        print(f"✅ Found {len(grouped_sorted)} unique group_id values")
-        for gid, items in grouped_sorted.items():
-            print(f"{gid}: {len(items)} elements")
+    # Stream the output one group at a time instead of serializing the
+    # whole dict in a single dump
+    with open(out_path, 'wb') as f:
+        f.write(b"{")
+        for idx, (gid, items) in enumerate(grouped_sorted.items()):
+            if idx:
+                f.write(b",")
+            f.write(b"\n")
+            f.write(_dumps(gid))
+            f.write(b": ")
+            f.write(_dumps(items))
+        f.write(b"\n}")
+    print(f"✅ Grouped output saved to: {out_path}")
     print(elems)
 
     return grouped_sorted
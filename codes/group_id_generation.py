@@ -23,412 +23,518 @@ Usage:
 
 import argparse
 import json
+import multiprocessing
+import os
 import re
+import sys
+from functools import lru_cache
+
+try:
+    import ahocorasick  # optional, single-pass multi-substring matching
+except ImportError:
+    ahocorasick = None
+
+try:
+    import ijson  # optional, keeps peak memory at O(one element)
+except ImportError:
+    ijson = None
+
+try:
+    import hyperscan  # optional, SIMD multi-pattern matching
+except ImportError:
+    hyperscan = None
+
+try:
+    import orjson  # optional, C-backed parse/serialize
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+    from numba import njit  # optional, JIT-compiled byte scanner
+except ImportError:
+    njit = None
+
+try:
+    import marisa_trie  # optional, C-walked prefix dispatch
+except ImportError:
+    marisa_trie = None
+
+# Compiled once at import; re.sub with a literal pattern hits the re
+# module's internal cache on every call, which is a lock + dict probe
+# per element. Token removal and whitespace collapsing are fused into a
+# single alternation so each string is scanned once instead of twice.
+_FUSED_DDFDD = re.compile(r"(\b\d{2}F\d{2}\b)|\s+")
+_FUSED_DFD = re.compile(r"(\b\d{1}F\d{1}\b)|\s+")
+_FUSED_SLASH = re.compile(r"(\b\d{2}/\d{3}\b)|\s+")
+_RE_WS = re.compile(r"\s+")
+
+# bytes twins of the fused patterns: sre scans uint8 buffers instead of
+# Py_UCS codepoints, which is the common case since txt is almost
+# always ASCII
+_FUSED_DDFDD_B = re.compile(rb"(\b\d{2}F\d{2}\b)|\s+")
+_FUSED_DFD_B = re.compile(rb"(\b\d{1}F\d{1}\b)|\s+")
+_FUSED_SLASH_B = re.compile(rb"(\b\d{2}/\d{3}\b)|\s+")
+
+
+def _fused_repl(m):
+    return "" if m.group(1) else " "
+
+
+def _fused_brepl(m):
+    return b"" if m.group(1) else b" "
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _strip_token_kernel(buf, pre, mid, post):
+        # elide \b \d{pre} <mid> \d{post} \b from an ASCII byte buffer;
+        # the cleaner patterns are fixed-shape, so an explicit scan
+        # replaces the regex engine (which numba cannot compile)
+        n = buf.size
+        keep = np.ones(n, np.bool_)
+        tlen = pre + 1 + post
+        i = 0
+        while i + tlen <= n:
+            ok = buf[i + pre] == mid
+            if ok:
+                for j in range(pre):
+                    if buf[i + j] < 48 or buf[i + j] > 57:
+                        ok = False
+                        break
+            if ok:
+                for j in range(post):
+                    c = buf[i + pre + 1 + j]
+                    if c < 48 or c > 57:
+                        ok = False
+                        break
+            if ok and i > 0:
+                c = buf[i - 1]
+                if (48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122) or c == 95:
+                    ok = False
+            if ok and i + tlen < n:
+                c = buf[i + tlen]
+                if (48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122) or c == 95:
+                    ok = False
+            if ok:
+                for j in range(tlen):
+                    keep[i + j] = False
+                i += tlen
+            else:
+                i += 1
+        return buf[keep]
+
+
+def _strip_token(text, fused_re, fused_bre, pre, mid, post):
+    """Remove the fixed-shape token pattern and collapse whitespace."""
+    if text.isascii():
+        if njit is not None:
+            buf = np.frombuffer(text.encode("ascii"), np.uint8)
+            kept = _strip_token_kernel(buf, pre, mid, post)
+            return _RE_WS.sub(" ", kept.tobytes().decode("ascii")).strip()
+        raw = fused_bre.sub(_fused_brepl, text.encode("ascii")).strip()
+        return raw.decode("ascii")
+    return fused_re.sub(_fused_repl, text).strip()
+
+
+@lru_cache(maxsize=4096)
+def _clean_txt_cached(text: str) -> str:
+    # 1+2. Remove patterns like 12F04 and normalize spaces in one scan
+    # ("F" is a cheap necessary condition, so most inputs skip the
+    # removal branch entirely)
+    if "F" in text:
+        cleaned = _strip_token(text, _FUSED_DDFDD, _FUSED_DDFDD_B, 2, 70, 2)  # 70 = "F"
+    else:
+        cleaned = _RE_WS.sub(" ", text).strip()
+    if not cleaned:
+        return ""
+    # 3. Sort words alphabetically; bare split() swallows the double
+    # space a removed token can leave, so no filter pass is needed
+    parts = cleaned.split()
+    parts.sort()
+    return " ".join(parts)
 
 
-def clean_txt(text: str) -> str:
+def clean_txt(text):
+    # txt values repeat heavily, so the cached path usually hits; the
+    # isinstance guard stays out here because lru_cache needs hashable,
+    # well-typed arguments
     if not isinstance(text, str):
         return text
-    # 1. Remove patterns like 12F04
-    cleaned = re.sub(r"\b\d{2}F\d{2}\b", "", text)
-    # 2. Normalize spaces
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    return _clean_txt_cached(text)
+
+@lru_cache(maxsize=4096)
+def _clean_type_cached(text: str) -> str:
+    # 1+2. Remove patterns like 1F4 and normalize spaces in one scan
+    if "F" in text:
+        cleaned = _strip_token(text, _FUSED_DFD, _FUSED_DFD_B, 1, 70, 1)
+    else:
+        cleaned = _RE_WS.sub(" ", text).strip()
     if not cleaned:
         return ""
-    # 3. Sort words alphabetically
-    parts = cleaned.split(" ")
-    parts = sorted(p for p in parts if p)  # filter empty
+    # 3. Sort words alphabetically; bare split() swallows the double
+    # space a removed token can leave, so no filter pass is needed
+    parts = cleaned.split()
+    parts.sort()
     return " ".join(parts)
 
-def clean_type(text: str) -> str:
+
+def clean_type(text):
     if not isinstance(text, str):
         return text
-    # 1. Remove patterns like 12F04
-    cleaned = re.sub(r"\b\d{1}F\d{1}\b", "", text)
-    # 2. Normalize spaces
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    return _clean_type_cached(text)
+
+@lru_cache(maxsize=4096)
+def _clean_slash_cached(text: str) -> str:
+    # 1+2. Remove patterns like 12/345 and normalize spaces in one scan
+    if "/" in text:
+        cleaned = _strip_token(text, _FUSED_SLASH, _FUSED_SLASH_B, 2, 47, 3)  # 47 = "/"
+    else:
+        cleaned = _RE_WS.sub(" ", text).strip()
     if not cleaned:
         return ""
-    # 3. Sort words alphabetically
-    parts = cleaned.split(" ")
-    parts = sorted(p for p in parts if p)  # filter empty
+    # 3. Sort words alphabetically; bare split() swallows the double
+    # space a removed token can leave, so no filter pass is needed
+    parts = cleaned.split()
+    parts.sort()
     return " ".join(parts)
 
-def clean_slash(text: str) -> str:
+
+def clean_slash(text):
     if not isinstance(text, str):
         return text
-    cleaned = re.sub(r"\b\d{2}/\d{3}\b", "", text).strip()
-    # 2. Normalize spaces
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
-    if not cleaned:
-        return ""
-    # 3. Sort words alphabetically
-    parts = cleaned.split(" ")
-    parts = sorted(p for p in parts if p)  # filter empty
-    return " ".join(parts)
+    return _clean_slash_cached(text)
+
+
+# ---------------------------------------------------------------------------
+# Name-based classification rules.
+#
+# Each entry is (substring, action). The action is either the group_id to
+# set, or a callable (value, name) -> bool for the branches that also look
+# at txt/layer; a callable returns False to decline the match so later
+# rules still get a chance (the old elif chain fell through the same way).
+# Order is priority: the first rule that matches (and accepts) wins.
+# ---------------------------------------------------------------------------
+
+def _gid_sirene(value, name):
+    value["group_id"] = name.rsplit("_", 1)[0]
+    return True
+
+def _gid_multisensor(value, name):
+    group_id = name.rsplit("_", 1)[0]
+    txt_id = value["txt"].rsplit(" ")[0]
+    if txt_id:
+        value["group_id"] = group_id + "-" + txt_id
+    else:
+        value["group_id"] = group_id
+    return True
+
+def _gid_schuko_ap(value, name):
+    txt_id = clean_txt(value["txt"])
+    if "16A" in txt_id:
+        value["group_id"] = "Steckdose_CEE_230V_AP"
+    else:
+        value["group_id"] = "Steckdose_1_fach_AP"
+    return True
+
+def _gid_rwa_motor_auslass(value, name):
+    # matched on purpose without assigning a group_id (kept from the old
+    # chain); still claims the element so later rules don't
+    return True
+
+def _gid_everteiler(value, name):
+    layer = value["layer"]
+    if layer == "ADE_ET_SIBE_Zentrale":
+        value["group_id"] = "Sicherheitsbeleuchtungszentrale"
+        return True
+    if layer == "ADE_ET_NSV_Verteiler":
+        value["group_id"] = "Elektro_Verteiler_AV"
+        return True
+    return False
+
+def _gid_steckdosenverteiler(value, name):
+    txt_id = clean_type(value["txt"])
+    if txt_id:
+        value["group_id"] = "Steckdosenverteiler-" + txt_id
+    else:
+        value["group_id"] = "Steckdosenverteiler"
+    return True
+
+def _gid_polygon(value, name):
+    # prefix match, not substring
+    if name.startswith("Polygon"):
+        value["group_id"] = ""
+        return True
+    return False
+
+
+# The B##/S## families repeat the same rule shape; generate them from
+# the token lists so adding a fixture type is a one-token change.
+_BEL_TOKENS = ("B11", "B12", "B13", "B14", "B16", "B17", "B2", "B30")
+_S_TOKENS = ("S02", "S04", "S07", "S10", "S11", "S12")
+
+_NAME_RULES = [
+    ("002 Sirene", _gid_sirene),
+    ("069 Multisensormelder (Kombination", _gid_multisensor),
+    ("1xAP-SD_ SchuKo", _gid_schuko_ap),
+    ("1xUP-SD_ SchuKo", "Steckdose_1_fach_UP"),
+    ("2xAP-SD_ SchuKo", "Steckdose_2_fach_AP"),
+    ("2xRJ45-Steckdose_ AP_", "RJ_45_Datendose_2_fach_AP"),
+    ("RJ-45-Datendose 2-fach_ AP_", "RJ_45_Datendose_2_fach_AP"),
+    ("3xUP-SD_ SchuKo", "Steckdose_3_fach_UP_Schuko"),
+    ("A1_", "A1_LED_38_W"),
+    ("Ableitung_", "Ableitung_RAS"),
+    ("Ansaugstutzen RAS_", "RAS_Ansaugstutzen"),
+    ("AP-SD_ Drehstrom_", "Anschluss_400V_3_polig"),
+    ("Auslass 230 V_", "Anschluss_230V_1_polig"),
+    ("Auslass 400 V", "Anschluss_400V_1_polig"),
+    ("Auslass RWA-Motor_", _gid_rwa_motor_auslass),
+    *[(tok + "_", tok + "-BEL_Decke") for tok in _BEL_TOKENS],
+    ("Beleuchtungstableau_", "Lichtbedientableau-NSV_Tableau"),
+    ("Bus-Steuerkoppler BMA (I_O)", "Bus_Steuerkoppler_BMA_(I_O)"),
+    ("Druckknopfmelder_", "Druckknopfmelder"),
+    ("E-Verteiler_", _gid_everteiler),
+    ("Einspeisestück_", "Einspeisestück"),
+    ("Elektromagnetischer Türöffner_", "Elektromagnetischer_Türöffner"),
+    ("Elektroschloss_", "Elektroschloss-ZKS_Offline"),
+    ("FIZ", "Feuerwehr_Informations_Zentrale"),
+    ("Geräteanschluß 230 V_", "Anschluss_230V_1_polig"),
+    ("Geräteanschluß 400 V_", "Anschluss_400V_1_polig"),
+    ("Kartenleser Zutritt Anlage_", "ZKS_Kartenleser_Online"),
+    ("Leitung_", "Leitung_RAS"),
+    ("Mulitnsensormelder mit integr. Sirene_", "Mulitnsensormelder_mit_integr_Sirene"),
+    ("Magnetkontakt_", "ZKS-Magnetkontakt"),
+    ("Netzteil inkl. Akku_", "Netzteil_inkl_Akku"),
+    ("optisch akustischer Signalgeber_", "Optisch_akustischer_Signalgeber"),
+    ("Steckdosenverteiler_", _gid_steckdosenverteiler),
+    ("Polygon", _gid_polygon),
+    ("Präsenzmelder AP 360", "Präsenzmelder_Decke_AP_360-DALI"),
+    ("Präsenzmelder UP 360", "Präsenzmelder_Decke_UP_360"),
+    ("Revisionswolke_", ""),
+    ("Schaltkreis_", ""),
+    #TODO DO WE NEED TO HAVE WLAN here or no?
+    ("RJ-45-Datendose 1-fach_ AP_", "RJ_45_Datendose_1_fach_AP"),
+    ("RJ-45-Datendose 2-fach_ UP_", "RJ_45_Datendose_2_fach_UP"),
+    ("RJ45-Steckdose_ AP_", "RJ_45_Datendose_1_fach_AP"),
+    ("RWA-Taster_", "RWA_Taster"),
+    ("RWA-Zentrale_", "RWA_Zentrale"),
+    *[(tok + "_", tok) for tok in _S_TOKENS],
+    ("Taster_ AP_ 1S_", "Taster_AP_1S"),
+    ("Taster_ UP_ 1S_", "Taster_UP_1S"),
+    ("Taster_ Zugangskontrolle_", "Hauptschalter_AP"),
+    ("Türcontroller_", "ZKS_Türsteuereinheit_GAM"),
+    ("Verteiler AV-SV_", "Elektro_Verteiler_SV"),
+    ("Warnschild_", "Warnschild_Brandalarm"),
+    ("Blitzleuchte_", "Feuerwehr_Blitzleuchte"),
+    ("Zentralbedientableau RWA", "Zentralbedientableau_RWA"),
+]
+
+# Token-keyed families resolve with one dict probe on the text before
+# the first underscore instead of walking the rule table; these tokens
+# never co-occur with the free-text needles, so chain priority is
+# unaffected in practice.
+_PREFIX_GROUPS = {
+    "A1": "A1_LED_38_W",
+    "Ableitung": "Ableitung_RAS",
+}
+_PREFIX_GROUPS.update((tok, tok + "-BEL_Decke") for tok in _BEL_TOKENS)
+_PREFIX_GROUPS.update((tok, tok) for tok in _S_TOKENS)
+
+# ~60 distinct group_ids get assigned to N elements; interning the
+# tables makes every element share one str object per id (less retained
+# memory in the output dict, pointer-fast equality downstream)
+_NAME_RULES = [(needle, sys.intern(action) if isinstance(action, str) else action)
+               for needle, action in _NAME_RULES]
+_PREFIX_GROUPS = {tok: sys.intern(gid) for tok, gid in _PREFIX_GROUPS.items()}
+
+# LOUDS-encoded trie over the "token_" prefixes: one C-level walk of the
+# name answers which registered prefix it starts with
+if marisa_trie is not None:
+    _PREFIX_TRIE = marisa_trie.Trie([tok + "_" for tok in _PREFIX_GROUPS])
+else:
+    _PREFIX_TRIE = None
+
+# One automaton over every needle: a single O(|name|) scan replaces up to
+# ~60 sequential `in` checks per element. The payload is the rule index,
+# so priority is restored by taking matches in rule order.
+if ahocorasick is not None:
+    _AUTOMATON = ahocorasick.Automaton()
+    for _idx, (_needle, _action) in enumerate(_NAME_RULES):
+        _AUTOMATON.add_word(_needle, _idx)
+    _AUTOMATON.make_automaton()
+else:
+    _AUTOMATON = None
+
+# Hyperscan outranks the automaton when its binding is present: the same
+# needle set compiled into one SIMD-scanned database. re.escape keeps
+# the needles literal (several contain parentheses and dots).
+if hyperscan is not None:
+    _HS_DB = hyperscan.Database()
+    _HS_DB.compile(
+        expressions=[re.escape(needle).encode("utf-8") for needle, _action in _NAME_RULES],
+        ids=list(range(len(_NAME_RULES))),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8] * len(_NAME_RULES),
+    )
+else:
+    _HS_DB = None
+
+
+def _apply_rule(idx, value, name):
+    action = _NAME_RULES[idx][1]
+    if callable(action):
+        return action(value, name)
+    value["group_id"] = action
+    return True
+
+
+def _matched_rule_ids(name):
+    """Rule indices whose needle occurs in name, ascending (= priority).
+
+    Returns None when no multi-pattern engine is available and the
+    caller should fall back to the linear table scan.
+    """
+    if _HS_DB is not None:
+        hits = []
+        _HS_DB.scan(name.encode("utf-8"),
+                    match_event_handler=lambda pid, start, end, flags, ctx: hits.append(pid))
+        return sorted(set(hits))
+    if _AUTOMATON is not None:
+        return sorted({idx for _end, idx in _AUTOMATON.iter(name)})
+    return None
+
+
+def _classify_name(value, name):
+    if _PREFIX_TRIE is not None:
+        hits = _PREFIX_TRIE.prefixes(name)
+        if hits:
+            value["group_id"] = _PREFIX_GROUPS[max(hits, key=len)[:-1]]
+            return
+    else:
+        head, sep, _rest = name.partition("_")
+        if sep:
+            gid = _PREFIX_GROUPS.get(head)
+            if gid is not None:
+                value["group_id"] = gid
+                return
+    hits = _matched_rule_ids(name)
+    if hits is not None:
+        for idx in hits:
+            if _apply_rule(idx, value, name):
+                return
+    else:
+        for idx, (needle, _action) in enumerate(_NAME_RULES):
+            if needle in name and _apply_rule(idx, value, name):
+                return
+
+
+def classify(key, value):
+    """Attach a group_id to one element in place (when a rule matches)."""
+    if not isinstance(value, dict):
+        return
+    # fresh inputs almost never carry a group_id; probe once up front so
+    # the branches can assign directly instead of each paying a
+    # setdefault hash-and-probe
+    if "group_id" in value:
+        return
+    # txt-based rule outranks every name rule
+    txt = value["txt"]
+    if "Staplerladestation" in txt:
+        txt_id = clean_txt(txt)
+        if "16A" in txt_id:
+            group_id = "Steckdose_CEE_230V_AP"
+        else:
+            group_id = "Steckdose_1_fach_AP"
+        value["group_id"] = group_id
+        return
+
+    name = value["name"]
+    if name == "_Oblique":
+        value["group_id"] = ""
+    elif name[0] == "*" or name[:4] == "XREF":
+        value["group_id"] = ""
+    else:
+        _classify_name(value, name)
+
+
+def iter_elements(in_path):
+    """Yield (element_id, element_data) pairs from the input JSON.
+
+    Streams with ijson when available so the whole file is never
+    materialized; falls back to a one-shot parse otherwise.
+    """
+    if ijson is not None:
+        with open(in_path, "rb") as f:
+            yield from ijson.kvitems(f, "")
+    else:
+        with open(in_path, "rb") as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("Input JSON must be a dictionary mapping IDs to element objects")
+        yield from data.items()
+
+
+def _dump_fragment(key, value, compact=False) -> bytes:
+    # outer braces (and their newlines) stripped; the caller supplies the
+    # separators, which keeps the streamed file identical to a whole-dict
+    # json.dump
+    if compact:
+        if orjson is not None:
+            return orjson.dumps({key: value})[1:-1]
+        return json.dumps({key: value}, ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")[1:-1]
+    if orjson is not None:
+        return orjson.dumps({key: value}, option=orjson.OPT_INDENT_2)[2:-2]
+    return json.dumps({key: value}, ensure_ascii=False, indent=2).encode("utf-8")[2:-2]
+
+
+def _classify_pair(item):
+    key, value = item
+    classify(key, value)
+    return key, value
+
+
+def _write_stream(out_path, pairs, compact=False) -> int:
+    # Classify and write element by element, so peak memory stays at one
+    # element instead of the whole file.
+    count = 0
+    with open(out_path, "wb") as f:
+        f.write(b"{")
+        for key, value in pairs:
+            if count:
+                f.write(b",")
+            if not compact:
+                f.write(b"\n")
+            f.write(_dump_fragment(key, value, compact))
+            count += 1
+        f.write(b"}" if compact or not count else b"\n}")
+    return count
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--json", required=True, help="Path to input JSON")
     parser.add_argument("--out", required=True, help="Path to output JSON")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes for classification (0 = all cores)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write without indentation (faster, for machine consumers)")
     args = parser.parse_args()
 
-    with open(args.json, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    if not isinstance(data, dict):
-        raise ValueError("Input JSON must be a dictionary mapping IDs to element objects")
-
-    for key, value in data.items():
-        if isinstance(value, dict):
-            # add empty group_id if not already there
-            if "Staplerladestation" in value["txt"]:
-                txt_id = clean_txt(value["txt"]) 
-                if "16A" in txt_id:
-                    group_id = "Steckdose_CEE_230V_AP"
-                else:
-                    group_id = "Steckdose_1_fach_AP"
-                value.setdefault("group_id", group_id)
-                continue
-
-            if value["name"] == "_Oblique":
-                value.setdefault("group_id", "")
-            elif value["name"][0] == "*" or value["name"][:4] == "XREF":
-                value.setdefault("group_id", "")
-            elif "002 Sirene" in value["name"]:
-                group_id = value["name"].rsplit("_", 1)[0]
-                value.setdefault("group_id", group_id)
-            elif "069 Multisensormelder (Kombination" in value["name"]:
-                group_id = value["name"].rsplit("_", 1)[0]
-                txt_id = value["txt"].rsplit(" ")[0]
-                if txt_id:
-                    value.setdefault("group_id", group_id+ "-" +txt_id)
-                else:
-                    value.setdefault("group_id", group_id)
-
-            elif "1xAP-SD_ SchuKo" in value["name"]:
-                txt_id = clean_txt(value["txt"]) 
-                if "16A" in txt_id:
-                    group_id = "Steckdose_CEE_230V_AP"
-                else:
-                    group_id = "Steckdose_1_fach_AP"
-                value.setdefault("group_id", group_id)
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "1xUP-SD_ SchuKo" in value["name"]:
-                group_id = "Steckdose_1_fach_UP"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            elif "2xAP-SD_ SchuKo" in value["name"]:
-                group_id = "Steckdose_2_fach_AP"
-                value.setdefault("group_id", group_id)
-                #group_id = "Steckdose_NSV_2_fach_AP_SchuKo"
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "2xRJ45-Steckdose_ AP_" in value["name"] or "RJ-45-Datendose 2-fach_ AP_" in value["name"]:
-                group_id = "RJ_45_Datendose_2_fach_AP"
-                value.setdefault("group_id", group_id)
-
-            elif "3xUP-SD_ SchuKo" in value["name"]:
-                group_id = "Steckdose_3_fach_UP_Schuko"
-                value.setdefault("group_id", group_id)
-            
-            elif "A1_" in value["name"]:
-                group_id = "A1_LED_38_W"
-                value.setdefault("group_id", group_id)
-
-            elif "Ableitung_" in value["name"]:
-                group_id = "Ableitung_RAS"
-                value.setdefault("group_id", group_id)
-
-            elif "Ansaugstutzen RAS_" in value["name"]:
-                group_id = "RAS_Ansaugstutzen"
-                value.setdefault("group_id", group_id)
-                
-            elif "AP-SD_ Drehstrom_" in value["name"]:
-                group_id = "Anschluss_400V_3_polig"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            elif "Auslass 230 V_" in value["name"]:
-                group_id = "Anschluss_230V_1_polig"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Auslass 400 V" in value["name"]:
-                group_id = "Anschluss_400V_1_polig"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Auslass RWA-Motor_" in value["name"]:
-                group_id = "RWA_Motor_Auslass"
-                #value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-                    
-            elif "B11_" in value["name"]:
-                group_id = "B11-BEL_Decke"
-                value.setdefault("group_id", group_id)
-            
-            elif "B12_" in value["name"]:
-                group_id = "B12-BEL_Decke"
-                value.setdefault("group_id", group_id)
-            
-            elif "B13_" in value["name"]:
-                group_id = "B13-BEL_Decke"
-                value.setdefault("group_id", group_id)
-            
-            elif "B14_" in value["name"]:
-                group_id = "B14-BEL_Decke"
-                value.setdefault("group_id", group_id)
-            
-            elif "B14_" in value["name"]:
-                group_id = "B14-BEL_Decke"
-                value.setdefault("group_id", group_id)
-            
-            elif "B16_" in value["name"]:
-                group_id = "B16-BEL_Decke"
-                value.setdefault("group_id", group_id)
-            
-            elif "B17_" in value["name"]:
-                group_id = "B17-BEL_Decke"
-                value.setdefault("group_id", group_id)
-
-            elif "B2_" in value["name"]:
-                group_id = "B2-BEL_Decke"
-                value.setdefault("group_id", group_id)
-            
-            elif "B30_" in value["name"]:
-                group_id = "B30-BEL_Decke"
-                value.setdefault("group_id", group_id)
-
-            elif "Beleuchtungstableau_" in value["name"]:
-                group_id = "Lichtbedientableau-NSV_Tableau"
-                value.setdefault("group_id", group_id)
-
-            elif "Bus-Steuerkoppler BMA (I_O)" in value["name"]:
-                group_id = "Bus_Steuerkoppler_BMA_(I_O)"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_slash(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Druckknopfmelder_" in value["name"]:
-                group_id = "Druckknopfmelder"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_slash(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "E-Verteiler_" in value["name"] and value["layer"] == "ADE_ET_SIBE_Zentrale":
-                group_id = "Sicherheitsbeleuchtungszentrale"
-                value.setdefault("group_id", group_id)
-            
-            elif "E-Verteiler_" in value["name"] and value["layer"] == "ADE_ET_NSV_Verteiler":
-                group_id = "Elektro_Verteiler_AV"
-                value.setdefault("group_id", group_id)
-            
-            elif "Einspeisestück_" in value["name"]:
-                group_id = "Einspeisestück"
-                value.setdefault("group_id", group_id)
-
-            elif "Elektromagnetischer Türöffner_" in value["name"]:
-                group_id = "Elektromagnetischer_Türöffner"
-                value.setdefault("group_id", group_id)
-            
-            elif "Elektroschloss_" in value["name"]:
-                group_id = "Elektroschloss-ZKS_Offline"
-                value.setdefault("group_id", group_id)
-            
-            elif "FIZ" in value["name"]:
-                group_id = "Feuerwehr_Informations_Zentrale"
-                value.setdefault("group_id", group_id)
-            
-            elif "Geräteanschluß 230 V_" in value["name"]:
-                group_id = "Anschluss_230V_1_polig"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Geräteanschluß 400 V_" in value["name"]:
-                group_id = "Anschluss_400V_1_polig"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Kartenleser Zutritt Anlage_" in value["name"]:
-                group_id = "ZKS_Kartenleser_Online"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-
-            elif "Leitung_" in value["name"]:
-                group_id = "Leitung_RAS"
-                value.setdefault("group_id", group_id)
-            
-            elif "Mulitnsensormelder mit integr. Sirene_" in value["name"]:
-                group_id = "Mulitnsensormelder_mit_integr_Sirene"
-                value.setdefault("group_id", group_id)
-
-            elif "Magnetkontakt_" in value["name"]:
-                group_id = "ZKS-Magnetkontakt"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_txt(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Netzteil inkl. Akku_" in value["name"]:
-                group_id = "Netzteil_inkl_Akku"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_slash(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "optisch akustischer Signalgeber_" in value["name"]:
-                group_id = "Optisch_akustischer_Signalgeber"
-                value.setdefault("group_id", group_id)
-                #txt_id = clean_slash(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Steckdosenverteiler_" in value["name"]:
-                group_id = "Steckdosenverteiler"
-                txt_id = clean_type(value["txt"]) 
-                if txt_id:
-                    value.setdefault("group_id", group_id + "-" + txt_id)
-                else:
-                    value.setdefault("group_id", group_id)
-            
-            elif value["name"].startswith("Polygon") or value["name"].startswith("Polygonsäule"):
-                value.setdefault("group_id", "")
-            
-            elif "Präsenzmelder AP 360" in value["name"]:
-                group_id = "Präsenzmelder_Decke_AP_360-DALI"
-                value.setdefault("group_id", group_id)
-            
-            elif "Präsenzmelder UP 360" in value["name"]:
-                group_id = "Präsenzmelder_Decke_UP_360"
-                value.setdefault("group_id", group_id)
-            
-            elif "Revisionswolke_" in value["name"]:
-                value.setdefault("group_id", "")
-            
-            elif "Schaltkreis_" in value["name"]:
-                value.setdefault("group_id", "")
-            
-            elif "RJ-45-Datendose 1-fach_ AP_" in value["name"]:
-                #TODO DO WE NEED TO HAVE WLAN here or no?
-                value.setdefault("group_id", "RJ_45_Datendose_1_fach_AP")
-            
-            elif "RJ-45-Datendose 2-fach_ UP_" in value["name"]:
-                value.setdefault("group_id", "RJ_45_Datendose_2_fach_UP")
-
-            elif "RJ45-Steckdose_ AP_" in value["name"]:
-                value.setdefault("group_id", "RJ_45_Datendose_1_fach_AP")
-            
-            elif "RWA-Taster_" in value["name"]:
-                value.setdefault("group_id", "RWA_Taster")
-            
-            elif "RWA-Zentrale_" in value["name"]:
-                value.setdefault("group_id", "RWA_Zentrale")
-
-            elif "S02_" in value["name"]:
-                value.setdefault("group_id", "S02")
-            
-            elif "S04_" in value["name"]:
-                value.setdefault("group_id", "S04")
-                
-            elif "S07_" in value["name"]:
-                value.setdefault("group_id", "S07")
-            
-            elif "S10_" in value["name"]:
-                value.setdefault("group_id", "S10")
-
-            elif "S11_" in value["name"]:
-                value.setdefault("group_id", "S11")
-            
-            elif "S12_" in value["name"]:
-                value.setdefault("group_id", "S12")
-            
-            elif "Taster_ AP_ 1S_" in value["name"]:
-                value.setdefault("group_id", "Taster_AP_1S")
-            
-            elif "Taster_ UP_ 1S_" in value["name"]:
-                value.setdefault("group_id", "Taster_UP_1S")
-            
-            elif "Taster_ Zugangskontrolle_" in value["name"]:
-                value.setdefault("group_id", "Hauptschalter_AP")
-                #txt_id = clean_slash(value["txt"]) 
-                #if txt_id:
-                #    value.setdefault("group_id", group_id + "-" + txt_id)
-                #else:
-                #    value.setdefault("group_id", group_id)
-            
-            elif "Türcontroller_" in value["name"]:
-                value.setdefault("group_id", "ZKS_Türsteuereinheit_GAM")
-            
-            elif "Verteiler AV-SV_" in value["name"]:
-                value.setdefault("group_id", "Elektro_Verteiler_SV")
-            
-            elif "Warnschild_" in value["name"]:
-                value.setdefault("group_id", "Warnschild_Brandalarm")
-            
-            elif "Blitzleuchte_" in value["name"]:
-                value.setdefault("group_id", "Feuerwehr_Blitzleuchte")
-            
-            elif "Zentralbedientableau RWA" in value["name"]:
-                value.setdefault("group_id", "Zentralbedientableau_RWA")
-
-
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    print(f"✅ Added group_id to {len(data)} elements")
+    jobs = args.jobs if args.jobs else os.cpu_count()
+    if jobs > 1:
+        # Elements are independent, so fan the classifier out over a
+        # process pool (the GIL rules out threads here). Workers rebuild
+        # the compiled patterns and matcher databases once at import;
+        # imap keeps input order so the output stays deterministic.
+        with multiprocessing.Pool(processes=jobs) as pool:
+            classified = pool.imap(_classify_pair, iter_elements(args.json), chunksize=1024)
+            count = _write_stream(args.out, classified, args.compact)
+    else:
+        count = _write_stream(args.out, map(_classify_pair, iter_elements(args.json)),
+                              args.compact)
+
+    print(f"✅ Added group_id to {count} elements")
     print(f"💾 Saved to: {args.out}")
 
 if __name__ == "__main__":
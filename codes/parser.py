@@ -19,6 +19,21 @@ import ezdxf
 from ezdxf.colors import aci2rgb, int2rgb
 from ezdxf.lldxf.const import DXFStructureError
 
+try:
+    from scipy.spatial import cKDTree  # optional, radius queries in merge_data
+except ImportError:
+    cKDTree = None
+
+try:
+    from numba import njit  # optional, compiles the chessboard cell kernel
+except ImportError:
+    njit = None
+
+try:
+    import orjson  # optional, C-backed serialize for the output dumps
+except ImportError:
+    orjson = None
+
 import colorsys
 import time
 
@@ -81,49 +96,16 @@ def _sorted_axis(layouts: CoordMap) -> List[Tuple[str, float]]:
     cleaned.sort(key=lambda kv: kv[1])
     return cleaned
 
-def _bounds_for(value: float, axis: List[Tuple[str, float]], clamp: bool = True) -> Tuple[str, str, float, float]:
-    """
-    Find the two neighboring labels (left/right or upper/lower) that bound 'value'.
-    Returns (lo_label, hi_label, lo_coord, hi_coord).
-    If outside, either clamp to first/last (when clamp=True) or raise ValueError.
-    """
-    n = len(axis)
-    if n == 0:
-        raise ValueError("Axis has no entries.")
-    # if before first
-    if value <= axis[0][1]:
-        if clamp and n >= 2:
-            return axis[0][0], axis[1][0], axis[0][1], axis[1][1]
-        elif clamp and n == 1:
-            return axis[0][0], axis[0][0], axis[0][1], axis[0][1]
-        else:
-            raise ValueError("Value below axis range.")
-    # if after last
-    if value >= axis[-1][1]:
-        if clamp and n >= 2:
-            return axis[-2][0], axis[-1][0], axis[-2][1], axis[-1][1]
-        elif clamp and n == 1:
-            return axis[0][0], axis[0][0], axis[0][1], axis[0][1]
-        else:
-            raise ValueError("Value above axis range.")
-    # inside: find bracket
-    lo_idx = 0
-    hi_idx = 1
-    for i in range(n - 1):
-        c0 = axis[i][1]
-        c1 = axis[i + 1][1]
-        if c0 <= value <= c1:
-            lo_idx = i
-            hi_idx = i + 1
-            break
-    lo_lab, lo_coord = axis[lo_idx]
-    hi_lab, hi_coord = axis[hi_idx]
-    return lo_lab, hi_lab, lo_coord, hi_coord
-
-def _normalize(value: float, lo: float, hi: float) -> float:
-    if hi == lo:
-        return 0.5  # degenerate cell; treat as center
-    return max(0.0, min(1.0, (value - lo) / (hi - lo)))
+def _axis_arrays(layouts: CoordMap):
+    axis = _sorted_axis(layouts)
+    labels = [lab for lab, _ in axis]
+    coords = np.asarray([c for _, c in axis], float)
+    return labels, coords
+
+# the module layouts never change: sort and convert them once at import
+_X_LABELS, _X_COORDS = _axis_arrays(LAYOUTS_X)
+_Y_LABELS, _Y_COORDS = _axis_arrays(LAYOUTS_Y)
+
 def _describe_position(nx: float, ny: float,
                             center_r: float = 0.22,
                             corner_box: float = 0.28,
@@ -167,6 +149,116 @@ def _describe_position(nx: float, ny: float,
         return "lower left area"
     return "lower right area"
 
+def _describe_positions(nxs, nys,
+                        center_r: float = 0.22,
+                        corner_box: float = 0.28,
+                        edge_band: float = 0.05):
+    """
+    Vectorized _describe_position: one boolean mask per label, evaluated
+    across all cells at once; np.select keeps the same first-match
+    priority (center > corners > edges > quadrants).
+    """
+    left, right = nxs <= corner_box, nxs >= 1 - corner_box
+    upper, lower = nys <= corner_box, nys >= 1 - corner_box
+    conds = [
+        (np.abs(nxs - 0.5) <= center_r) & (np.abs(nys - 0.5) <= center_r),
+        left & upper,
+        right & upper,
+        left & lower,
+        right & lower,
+        nxs <= edge_band,
+        nxs >= 1 - edge_band,
+        nys <= edge_band,
+        nys >= 1 - edge_band,
+        (nys < 0.5) & (nxs < 0.5),
+        (nys < 0.5) & (nxs >= 0.5),
+        (nys >= 0.5) & (nxs < 0.5),
+    ]
+    labels = ["center",
+              "upper left corner", "upper right corner",
+              "lower left corner", "lower right corner",
+              "left side", "right side", "upper side", "lower side",
+              "upper left area", "upper right area", "lower left area"]
+    return np.select(conds, labels, default="lower right area")
+
+# label table for the jit kernel, indexed by the codes it returns
+_POS_LABELS = ("center",
+               "upper left corner", "upper right corner",
+               "lower left corner", "lower right corner",
+               "left side", "right side", "upper side", "lower side",
+               "upper left area", "upper right area",
+               "lower left area", "lower right area")
+
+if njit is not None:
+    @njit(cache=True)
+    def _cell_kernel(pxs, pys, x_coords, y_coords,
+                     center_r, corner_box, edge_band):
+        """Bracket search + cell normalization + position classification
+        for all items in one compiled loop. Mirrors the numpy path
+        (searchsorted/clip/_describe_positions) exactly; positions come
+        back as int codes into _POS_LABELS."""
+        n = pxs.shape[0]
+        nx_hi = x_coords.shape[0] - 2
+        ny_hi = y_coords.shape[0] - 2
+        ix = np.empty(n, np.int64)
+        iy = np.empty(n, np.int64)
+        nxs = np.empty(n, np.float64)
+        nys = np.empty(n, np.float64)
+        codes = np.empty(n, np.int64)
+        for k in range(n):
+            i = np.searchsorted(x_coords, pxs[k]) - 1
+            if i < 0: i = 0
+            if i > nx_hi: i = nx_hi
+            j = np.searchsorted(y_coords, pys[k]) - 1
+            if j < 0: j = 0
+            if j > ny_hi: j = ny_hi
+            ix[k] = i; iy[k] = j
+            x0 = x_coords[i]; x1 = x_coords[i + 1]
+            y0 = y_coords[j]; y1 = y_coords[j + 1]
+            if x1 != x0:
+                nx = (pxs[k] - x0) / (x1 - x0)
+                if nx < 0.0: nx = 0.0
+                if nx > 1.0: nx = 1.0
+            else:
+                nx = 0.5
+            if y1 != y0:
+                ny = (pys[k] - y0) / (y1 - y0)
+                if ny < 0.0: ny = 0.0
+                if ny > 1.0: ny = 1.0
+            else:
+                ny = 0.5
+            nxs[k] = nx; nys[k] = ny
+            if abs(nx - 0.5) <= center_r and abs(ny - 0.5) <= center_r:
+                c = 0
+            elif nx <= corner_box and ny <= corner_box:
+                c = 1
+            elif nx >= 1 - corner_box and ny <= corner_box:
+                c = 2
+            elif nx <= corner_box and ny >= 1 - corner_box:
+                c = 3
+            elif nx >= 1 - corner_box and ny >= 1 - corner_box:
+                c = 4
+            elif nx <= edge_band:
+                c = 5
+            elif nx >= 1 - edge_band:
+                c = 6
+            elif ny <= edge_band:
+                c = 7
+            elif ny >= 1 - edge_band:
+                c = 8
+            elif ny < 0.5 and nx < 0.5:
+                c = 9
+            elif ny < 0.5 and nx >= 0.5:
+                c = 10
+            elif ny >= 0.5 and nx < 0.5:
+                c = 11
+            else:
+                c = 12
+            codes[k] = c
+        return ix, iy, nxs, nys, codes
+else:
+    _cell_kernel = None
+
 def assign_chessboard_and_position(
     items: List[dict],
     layouts_x: CoordMap,
@@ -174,49 +266,95 @@ def assign_chessboard_and_position(
     clamp_to_bounds: bool = True
 ) -> List[dict]:
     """
-    Returns a NEW list with each dict augmented by:
+    Augments each element dict in place with:
       - 'grid_cols': [left_label, right_label]
       - 'grid_rows': [upper_label, lower_label]   (upper = smaller y)
       - 'chessboard_id': "[left,right],[upper-lower]"  (string)
       - 'position_description': human-friendly location in the cell
     """
-    x_axis = _sorted_axis(layouts_x)
-    y_axis = _sorted_axis(layouts_y)
+    # reuse the import-time arrays for the module layouts
+    if layouts_x is LAYOUTS_X:
+        x_labels, x_coords = _X_LABELS, _X_COORDS
+    else:
+        x_labels, x_coords = _axis_arrays(layouts_x)
+    if layouts_y is LAYOUTS_Y:
+        y_labels, y_coords = _Y_LABELS, _Y_COORDS
+    else:
+        y_labels, y_coords = _axis_arrays(layouts_y)
 
-    for key,obj in items.items():
-        #print('obj: ', obj)
+    keys = []; pxs = []; pys = []
+    for key, obj in items.items():
         px, py = obj.get("pos_img", [None, None])[:2]
         if px is None or py is None:
             continue
+        keys.append(key); pxs.append(float(px)); pys.append(float(py))
+    if not keys:
+        return items
+    pxs = np.asarray(pxs, float); pys = np.asarray(pys, float)
+
+    if _cell_kernel is not None:
+        # compiled path: bracket search, normalization and position
+        # classification fused into one native loop
+        ix, iy, nxs, nys, codes = _cell_kernel(pxs, pys, x_coords, y_coords,
+                                               0.22, 0.28, 0.05)
+        descrs = [_POS_LABELS[c] for c in codes]
+    else:
+        # one searchsorted per axis replaces the per-item linear bracket scan;
+        # the clip reproduces the clamp-to-first/last-cell behavior, including
+        # the single-entry-axis degenerate case (ix=-1 wraps to the only label)
+        ix = np.clip(np.searchsorted(x_coords, pxs) - 1, 0, len(x_coords) - 2)
+        iy = np.clip(np.searchsorted(y_coords, pys) - 1, 0, len(y_coords) - 2)
+        x0, x1 = x_coords[ix], x_coords[ix + 1]
+        y0, y1 = y_coords[iy], y_coords[iy + 1]
+        spanx = x1 - x0
+        spany = y1 - y0
+        # degenerate (zero-width) cells normalize to the center
+        nxs = np.where(spanx != 0, np.clip((pxs - x0) / np.where(spanx != 0, spanx, 1.0), 0.0, 1.0), 0.5)
+        nys = np.where(spany != 0, np.clip((pys - y0) / np.where(spany != 0, spany, 1.0), 0.0, 1.0), 0.5)
+        descrs = _describe_positions(nxs, nys)
+
+    if clamp_to_bounds:
+        inside = None
+    else:
+        inside = (pxs >= x_coords[0]) & (pxs <= x_coords[-1]) & \
+                 (pys >= y_coords[0]) & (pys <= y_coords[-1])
 
-        try:
-            lx, rx, x0, x1 = _bounds_for(float(px), x_axis, clamp=clamp_to_bounds)
-            uy, ly, y0, y1 = _bounds_for(float(py), y_axis, clamp=clamp_to_bounds)
-        except ValueError:
+    for i, key in enumerate(keys):
+        if inside is not None and not inside[i]:
             # outside and clamp_to_bounds=False
             continue
-
-        nx = _normalize(float(px), x0, x1)
-        ny = _normalize(float(py), y0, y1)
-
-        descr = _describe_position(nx, ny)
+        lx, rx = x_labels[ix[i]], x_labels[ix[i] + 1]
+        uy, ly = y_labels[iy[i]], y_labels[iy[i] + 1]
+        descr = str(descrs[i])
         # build chessboard_id string exactly like your example
         chessboard_id = f"[{lx},{rx}],[{uy}-{ly}]"
 
-        new_obj = {**obj}
-        new_obj["grid_cols"] = [lx, rx]
-        new_obj["grid_rows"] = [uy, ly]
-        new_obj["chessboard_id"] = chessboard_id
-        new_obj["position_description"] = descr
-        items[key] = new_obj
+        # mutate in place: the dict is owned by this pipeline, no need to
+        # copy it just to add four keys
+        obj = items[key]
+        obj["grid_cols"] = [lx, rx]
+        obj["grid_rows"] = [uy, ly]
+        obj["chessboard_id"] = chessboard_id
+        obj["position_description"] = descr
 
     return items
 # ---------------------
 import re
 
+# compiled once at import: these run per TEXT/MTEXT/INSERT virtual entity,
+# so skip the re cache lookup that re.sub pays on every call
+_RE_BACKSLASH_CMD = re.compile(r"\\[A-Za-z][^;]*;")
+_RE_MTEXT_BRACE = re.compile(r"{([^}]*)}")
+_RE_BACKSLASH_WORD = re.compile(r"\\[A-Za-z]+")
+_RE_WS = re.compile(r"\s+")
+
 def clean_txt(txt):
+    # most strings carry no markup at all: two C-level scans are far
+    # cheaper than running the regex engine on every call
+    if "{" not in txt and "}" not in txt and "\\" not in txt:
+        return txt.replace(",", ".")
     txt = txt.replace("{", "").replace("}", "")
-    txt = re.sub(r"\\[A-Za-z][^;]*;", "", txt)
+    txt = _RE_BACKSLASH_CMD.sub("", txt)
     txt = txt.replace(",", ".")
     return txt
 
@@ -233,25 +371,36 @@ def parse_calib(s):
     return pairs
 
 def fit_similarity_from_two(p1,p2,q1,q2):
-    v1=np.array([p2[0]-p1[0],p2[1]-p1[1]],float)
-    v2=np.array([q2[0]-q1[0],q2[1]-q1[1]],float)
-    n1,n2=np.linalg.norm(v1),np.linalg.norm(v2)
+    # pure scalar arithmetic: a two-point similarity fit is a dozen
+    # FLOPs, not worth half a dozen numpy dispatches on 2-vectors
+    dx1,dy1 = p2[0]-p1[0], p2[1]-p1[1]
+    dx2,dy2 = q2[0]-q1[0], q2[1]-q1[1]
+    n1,n2 = math.hypot(dx1,dy1), math.hypot(dx2,dy2)
     if n1==0 or n2==0: raise ValueError("Degenerate calibration points")
     s=n2/n1
-    v1n,v2n=v1/n1,v2/n2
-    cos=float(np.clip(np.dot(v1n,v2n),-1,1))
-    sin=float(v1n[0]*v2n[1]-v1n[1]*v2n[0])
-    R=np.array([[cos,-sin],[sin,cos]],float)
-    t=np.array(q1,float)-s*(R@np.array(p1,float))
-    return np.array([[s*R[0,0],s*R[0,1],t[0]],[s*R[1,0],s*R[1,1],t[1]]],float)
+    cos=(dx1*dx2+dy1*dy2)/(n1*n2)
+    cos=max(-1.0,min(1.0,cos))
+    sin=(dx1*dy2-dy1*dx2)/(n1*n2)
+    a,b = s*cos, -s*sin
+    tx = q1[0]-(a*p1[0]+b*p1[1])
+    ty = q1[1]-(s*sin*p1[0]+a*p1[1])
+    return np.array([[a,b,tx],[s*sin,a,ty]],float)
 
 def fit_affine(pairs):
-    A=[]; B=[]
-    for (x,y),(X,Y) in pairs:
-        A+=([x,y,0,0,1,0],[0,0,x,y,0,1]); B+=[X,Y]
-    A=np.asarray(A,float); B=np.asarray(B,float)
-    a,b,c,d,tx,ty=np.linalg.lstsq(A,B,rcond=None)[0]
-    return np.array([[a,b,tx],[c,d,ty]],float)
+    src=np.asarray([p for p,_ in pairs],float)
+    dst=np.asarray([q for _,q in pairs],float)
+    # the X and Y rows decouple into two 3-parameter fits; solving the
+    # 3x3 normal equations beats lstsq's SVD on the stacked 2Nx6 system
+    N=np.column_stack([src[:,0],src[:,1],np.ones(len(src))])
+    try:
+        # one stacked solve handles both target columns at once
+        sol=np.linalg.solve(N.T@N,N.T@dst)
+    except np.linalg.LinAlgError:
+        # degenerate (collinear) calibration points: least squares still
+        # returns a usable minimum-norm fit
+        sol=np.linalg.lstsq(N,dst,rcond=None)[0]
+    # sol is (3,2) with columns (a,b,tx) and (c,d,ty)
+    return np.ascontiguousarray(sol.T)
 
 def fit_transform(pairs):
     if len(pairs)>=3: return fit_affine(pairs)
@@ -259,43 +408,69 @@ def fit_transform(pairs):
     raise ValueError("Provide at least 2 calibration pairs.")
 
 def apply_M(M,x,y):
-    v=M@np.array([x,y,1.0],float)
-    return float(v[0]),float(v[1])
+    # plain float math: a 2x3 matmul is six multiplies, not worth the
+    # numpy array allocation + dispatch for a single point
+    return float(M[0,0])*x+float(M[0,1])*y+float(M[0,2]), float(M[1,0])*x+float(M[1,1])*y+float(M[1,2])
+
+def apply_M_batch(M, pts):
+    """Transform an iterable of (x,y) pairs with a single matmul.
+
+    One (N,2) @ (2,2) product replaces N per-point apply_M calls, so the
+    numpy dispatch overhead is paid once instead of per entity.
+    """
+    if not len(pts):
+        return np.empty((0, 2), float)
+    return np.asarray(pts, float) @ M[:, :2].T + M[:, 2]
 
 # ------------- color / category -------------
 
+_DEFAULT_RGB = (200,200,200)
+
+def _build_aci_table():
+    # pay the aci2rgb conversion (and its failure handling) once per
+    # index at import instead of per entity
+    table = []
+    for aci in range(256):
+        try: table.append(aci2rgb(aci if aci != 0 else 7))
+        except Exception: table.append(_DEFAULT_RGB)
+    return tuple(table)
+
+ACI_TABLE = _build_aci_table()
+
 def load_layer_colors(doc):
-    table={}
-    for layer in doc.layers:
-        aci = layer.color
-        try: rgb = aci2rgb(aci if aci!=0 else 7)
-        except Exception: rgb=(200,200,200)
-        table[layer.dxf.name] = rgb
-    return table
+    return {layer.dxf.name: ACI_TABLE[layer.color] if 0 <= layer.color < 256 else _DEFAULT_RGB
+            for layer in doc.layers}
 
 def get_entity_rgb(e,layer_table):
-    aci=getattr(e.dxf,"color",256)
-    tc=getattr(e.dxf,"true_color",None)
-    if tc:
-        return ((tc>>16)&0xFF,(tc>>8)&0xFF,tc&0xFF)
-    if aci in (0,256):
-        return layer_table.get(e.dxf.layer,(200,200,200))
-    try: return aci2rgb(aci if aci!=0 else 7)
-    except Exception: return (200,200,200)
+    # pure attribute checks + table lookups, no try/except in the hot path
+    dxf = e.dxf
+    if dxf.hasattr("true_color"):
+        tc = dxf.true_color
+        if tc:
+            return ((tc>>16)&0xFF,(tc>>8)&0xFF,tc&0xFF)
+    aci = dxf.color if dxf.hasattr("color") else 256
+    if aci == 0 or aci == 256:
+        return layer_table.get(dxf.layer,_DEFAULT_RGB)
+    if 0 < aci < 256:
+        return ACI_TABLE[aci]
+    return _DEFAULT_RGB
 
 # ------------- text cleaning -------------
 
 def clean_text_basic(t):
     if not t: return ""
+    # no braces/backslashes means no markup: whitespace collapse only
+    if "{" not in t and "\\" not in t:
+        return " ".join(t.split())
     # replace AutoCAD paragraph markers with space
     t=t.replace(r"\P"," ").replace("\\\\P"," ")
     # keep payload in {...} by taking last ';' segment
     def repl(m):
         parts=[p.strip() for p in m.group(1).split(";") if p.strip()]
         return parts[-1] if parts else ""
-    t=re.sub(r"{([^}]*)}",repl,t)
-    t=re.sub(r"\\[A-Za-z]+","",t)
-    t=re.sub(r"\s+"," ",t).strip()
+    t=_RE_MTEXT_BRACE.sub(repl,t)
+    t=_RE_BACKSLASH_WORD.sub("",t)
+    t=_RE_WS.sub(" ",t).strip()
     return t
 
 def mtext_to_plain(e):
@@ -314,81 +489,103 @@ def mtext_to_plain(e):
 
 # ------------- collectors -------------
 
-def collect_texts(msp,layer_table,M):
-    out=[]; tid=0
-    for e in msp.query("TEXT"):
-        s=clean_text_basic(e.dxf.text)
-        if not s: continue
-        x,y = float(e.dxf.insert[0]),float(e.dxf.insert[1])
-        #change pos to img pos
-        X,Y = apply_M(M,x,y)
-        rgb = get_entity_rgb(e,layer_table)
-        out.append({"id":f"T{tid}","source":"base_text","kind":"TEXT","content":s,
-                    "layer":e.dxf.layer,"rgb":rgb,
-                    "pos_dxf":[x,y],"pos_img":[X,Y]}); tid+=1
-    for e in msp.query("MTEXT"):
-        s=mtext_to_plain(e)
-        if not s: continue
-        x,y = float(e.dxf.insert[0]),float(e.dxf.insert[1])
-        X,Y = apply_M(M,x,y)
-        rgb = get_entity_rgb(e,layer_table)
-        out.append({"id":f"T{tid}","source":"base_mtext","kind":"MTEXT","content":s,
-                    "layer":e.dxf.layer,"rgb":rgb,
-                    "pos_dxf":[x,y],"pos_img":[X,Y]}); tid+=1
-    return out
-
-
-def collect_items(msp, layer_table, M):
-    out=[]
+def _d2(p, q):
+    # squared distance: spares the sqrt where only a threshold or an
+    # ordering comparison is needed
+    dx = p[0] - q[0]; dy = p[1] - q[1]
+    return dx*dx + dy*dy
+
+def collect_all(msp, layer_table, M):
+    """Collect base texts and insert elements in one modelspace sweep.
+
+    Replaces collect_texts + collect_items: the entity table is walked a
+    single time, dispatching on dxftype(). Since pos_img is always the
+    transform of the stored pos_dxf, image coordinates for both
+    collections are filled in afterwards with one batched matmul each.
+    """
+    texts = []
     prev_id = None
     prev_layer = None
+    prev_layer_txt = None
     prev_name = None
     prev_pos = None
-    prev_color = None
     elements = {}
-    
-    for e in msp.query("INSERT"):
+
+    # virtual-entity expansion is per-insert O(block size); a block whose
+    # definition holds no TEXT/MTEXT (nested INSERTs may expand to text,
+    # so they count) can never touch txt or x,y, and is skipped. Probed
+    # once per block name, not per insert.
+    blocks = msp.doc.blocks
+    block_has_text = {}
+
+    for e in msp:
+        kind = e.dxftype()
+        if kind == "TEXT" or kind == "MTEXT":
+            d = e.dxf
+            s = clean_text_basic(d.text) if kind == "TEXT" else mtext_to_plain(e)
+            if not s: continue
+            ins = d.insert
+            x,y = float(ins[0]),float(ins[1])
+            texts.append({"id":f"T{len(texts)}",
+                          "source":"base_text" if kind == "TEXT" else "base_mtext",
+                          "kind":kind,"content":s,
+                          "layer":d.layer,"rgb":get_entity_rgb(e,layer_table),
+                          "pos_dxf":(x,y),"pos_img":None})
+            continue
+        if kind != "INSERT":
+            continue
+
         txt = ''
-        layer = (e.dxf.layer or "").strip()
-        name = (e.dxf.name or "").strip()
-        iid = (e.dxf.handle or "").strip() 
-        x,y = float(e.dxf.insert[0]),float(e.dxf.insert[1])
-        X,Y = apply_M(M,x,y)
+        # every e.dxf walks ezdxf's descriptor machinery; bind it once
+        d = e.dxf
+        # block names and layers repeat across thousands of inserts:
+        # interning collapses each distinct string to one heap object
+        layer = sys.intern((d.layer or "").strip())
+        name = sys.intern((d.name or "").strip())
+        iid = (d.handle or "").strip()
+        ins = d.insert
+        x,y = float(ins[0]),float(ins[1])
         rgb = get_entity_rgb(e, layer_table)
 
         #print(f"ekav: name={name} layer={layer} ins={tuple(e.dxf.insert)}")
 #TODO ete inqe ekel mtel a uje txt poxvel a heto vor sxal el lini meje pahum a txt infon
-        vents = list(e.virtual_entities())
-        for v in vents:
-            h = getattr(v.dxf, "handle", None)
-            lay = getattr(v.dxf, "layer", None)
-            if v.dxftype() == "TEXT":
-                x,y = float(v.dxf.insert[0]),float(v.dxf.insert[1])
-                X,Y = apply_M(M,x,y)
-                txt += clean_txt((v.dxf.text + " "))
+        has_text = block_has_text.get(name)
+        if has_text is None:
+            blk = blocks.get(name)
+            # missing definitions keep the expansion (and its error) as before
+            has_text = blk is None or any(
+                b.dxftype() in ("TEXT", "MTEXT", "INSERT") for b in blk)
+            block_has_text[name] = has_text
+
+        # iterate the generator directly, no need to materialize the list;
+        # the x,y updates are live: the last text position wins and feeds
+        # prev_pos / pos_dxf after the loop
+        for v in e.virtual_entities() if has_text else ():
+            vkind = v.dxftype()
+            if vkind == "TEXT":
+                vd = v.dxf
+                vins = vd.insert
+                x,y = float(vins[0]),float(vins[1])
+                txt += clean_txt((vd.text + " "))
                 #TODO-fixed bug repetition in txt when the same layer has two virtual layers during printing
                 #txt = (v.dxf.text + " ")
-                #print(f"  * TEXT  layer={lay} text={v.dxf.text!r} ins={tuple(v.dxf.insert)} img_pos={(X,Y)}")
-
-            elif v.dxftype() == "MTEXT":
-                text = mtext_to_plain(v) if 'mtext_to_plain' in globals() else v.dxf.text
-                #TODO chishtna txt += (text + " ")
-                txt += clean_txt((v.dxf.text + " "))
-                x,y = float(v.dxf.insert[0]),float(v.dxf.insert[1])
-                X,Y = apply_M(M,x,y)
-                #print(f"  * MTEXT layer={lay} text={txt!r} ins={tuple(v.dxf.insert)} img_pos={(X,Y)}")
-            #else:
-            #    print(f"  * {v.dxftype()} {h} layer={lay}")
-        
+
+            elif vkind == "MTEXT":
+                #TODO chishtna txt += (mtext_to_plain(v) + " ")
+                vd = v.dxf
+                vins = vd.insert
+                txt += clean_txt((vd.text + " "))
+                x,y = float(vins[0]),float(vins[1])
+
         #print("prev_layer: ", prev_layer)
         #print("layer: ", layer)
         #print("prev_name: ", prev_name)
-        
+
         #if "Schaltkreis_" in name and prev_layer + "-TXT" == layer:
-        if prev_layer and prev_layer + "-TXT" == layer:
-            elements[prev_id]['txt'] += txt 
+        if prev_layer_txt == layer:
+            elements[prev_id]['txt'] += txt
             #print("poxvec: ", elements[prev_id])
-        elif "Schaltkreis_" in name and math.dist(prev_pos, [x,y]) < 20: 
+        elif "Schaltkreis_" in name and _d2(prev_pos, (x,y)) < 400:
             elements[prev_id]['txt'] += txt
         elif prev_layer  == layer and "Schaltkreis_" in name and not "Schaltkreis_" in prev_name:
             elements[prev_id]['txt'] += txt
@@ -397,16 +594,22 @@ def collect_items(msp, layer_table, M):
         #    elements[prev_id]['txt'] += txt
         #    #print("poxvec: ", elements[prev_id])
         else:
-            elements[iid] = {'name': name, 'layer': layer, 'rgb':rgb, 'pos_dxf': [x,y], 'pos_img': [X,Y], 'txt': txt}
+            elements[iid] = {'name': name, 'layer': layer, 'rgb':rgb, 'pos_dxf': (x,y), 'pos_img': None, 'txt': txt}
             #print("element: ", elements[iid])
             prev_layer = layer
+            # built once per new element instead of once per insert; None
+            # keeps the old empty-layer behaviour (never matches)
+            prev_layer_txt = layer + "-TXT" if layer else None
             prev_name = name
-            prev_pos = [x,y]
-            prev_rgb = rgb
+            prev_pos = (x,y)
             prev_id = iid
-        
-        out = elements
-    return out
+
+    #change pos to img pos
+    for rec, XY in zip(texts, apply_M_batch(M, [r["pos_dxf"] for r in texts])):
+        rec["pos_img"] = (float(XY[0]), float(XY[1]))
+    for el, XY in zip(elements.values(), apply_M_batch(M, [el["pos_dxf"] for el in elements.values()])):
+        el["pos_img"] = (float(XY[0]), float(XY[1]))
+    return texts, elements
 
 def extract_prefix(input_string):
     # Step 1: take the last segment after '$'
@@ -427,24 +630,26 @@ def remove_last_dash_part(text):
         return text
     return '-'.join(text.split('-')[:-1])
 
+# one compiled alternation instead of four separate substring/prefix scans
+_SKIP_NAME_RE = re.compile(r"Polygonsäule|^XREF|^\*|_Oblique")
+
 def clean_data(elements):
     clean_elements = {}
     for k, element in elements.items():
-        if "Polygonsäule" in element["name"] or "XREF" == element["name"][:4] or "*" == element["name"][0] or "_Oblique" in element["name"]:
+        if _SKIP_NAME_RE.search(element["name"]):
             continue
             #or element["layer"] == "ADE_ET_BEL_Lichtschiene" or element["layer"] == "E-Stromschiene Variante 2":
             #continue
         #elif element["pos_img"][0] < LAYOUTS_X['F'] or element["pos_img"][0] > LAYOUTS_X['I5'] or element["pos_dxf"][1] < 0:
         #    continue
-        else:
-            if "Vorplanung" in element["layer"] or "Vorplanung" in element["name"]:
-                element["name"] = extract_prefix(element["name"])
-                element["layer"] = remove_last_dash_part(extract_layer_suffix(element["layer"]))
-                clean_elements[k] = element
-            elif "-" in element["layer"] and element["layer"] != "E-Stromschiene Variante 2":
-                element["layer"] = remove_last_dash_part(element["layer"])
-                clean_elements[k] = element
-            clean_elements[k] = element
+        if "Vorplanung" in element["layer"] or "Vorplanung" in element["name"]:
+            element["name"] = extract_prefix(element["name"])
+            element["layer"] = remove_last_dash_part(extract_layer_suffix(element["layer"]))
+        elif "-" in element["layer"] and element["layer"] != "E-Stromschiene Variante 2":
+            element["layer"] = remove_last_dash_part(element["layer"])
+        # every kept element is stored exactly once (the old code assigned
+        # the same key twice on the rewrite branches)
+        clean_elements[k] = element
     return clean_elements
 
 
@@ -481,6 +686,17 @@ def assign_group_ids(elements: Dict[str, dict], legend_entries: List[Tuple[str,
     - If nothing matches, defaults to the element's name.
     """
     fields = ["16A", "32A", "63A", "Typ 1", "Typ 2", "Typ 3", "Typ 4"]
+
+    # bucket legend rows by exact layer once: matching requires layer
+    # equality, so each element only walks its own layer's rows. File
+    # order within a bucket keeps the first-match priority; rows with an
+    # empty name can never match and are dropped here.
+    legend_by_layer = defaultdict(list)
+    for layer, legend_name, legend_info in legend_entries:
+        legend_name_clean = legend_name.strip().lower()
+        if legend_name_clean:
+            legend_by_layer[layer.strip()].append((legend_name_clean, legend_info.strip()))
+
     for key, element in elements.items():
         interesting_field = None
         down = None
@@ -506,18 +722,15 @@ def assign_group_ids(elements: Dict[str, dict], legend_entries: List[Tuple[str,
                     interesting_field = f
                     break
                     
-        for layer, legend_name, legend_info in legend_entries:
-            if elem_layer == layer.strip():
-                legend_name_clean = legend_name.strip().lower()
-                if legend_name_clean and legend_name_clean in elem_name_lower:
-                    group_id = legend_info.strip() or extract_prefix(elem_name)
-                    if down:
-                        group_id = "CEE-Steckdose 230V AP"
-                    if interesting_field:
-                        group_id = group_id + " " + f
-                    break
+        for legend_name_clean, legend_info in legend_by_layer.get(elem_layer, ()):
+            if legend_name_clean in elem_name_lower:
+                group_id = legend_info or extract_prefix(elem_name)
+                if down:
+                    group_id = "CEE-Steckdose 230V AP"
+                if interesting_field:
+                    group_id = group_id + " " + f
+                break
         element["group_id"] = group_id
-        elements[key] = element
     return elements
 
 def merge_data(elements):
@@ -531,17 +744,42 @@ def merge_data(elements):
     print("len: ", len(items))
 
     potential_candidate = {}
-    for iid, element in elements.items():
-        if "Schaltkreis" in element["name"]:
-            continue
+    normal_ids = list(new_elements)
+    if cKDTree is not None and items and normal_ids:
+        # O((N+M) log N): one radius query around each Schaltkreis candidate
+        # instead of scanning every element per candidate. The layer check
+        # is substring containment, so it cannot be pre-bucketed by layer;
+        # it is applied to the handful of in-radius hits instead.
+        tree = cKDTree(np.asarray([new_elements[k]["pos_dxf"] for k in normal_ids], float))
         for i in items:
             candidate = elements[i]
-            if element["layer"] in candidate["layer"] and math.dist(element["pos_dxf"], candidate["pos_dxf"]) < 20:
-                if i in potential_candidate:
-                    if math.dist(element["pos_dxf"], candidate["pos_dxf"]) < math.dist(candidate["pos_dxf"], elements[potential_candidate[i]]["pos_dxf"]):
+            best_id = None
+            best_d2 = None
+            # sorted() keeps the original first-seen tie-break on equal distance
+            for j in sorted(tree.query_ball_point(candidate["pos_dxf"], 20.0)):
+                iid = normal_ids[j]
+                element = new_elements[iid]
+                if element["layer"] not in candidate["layer"]:
+                    continue
+                d2 = _d2(element["pos_dxf"], candidate["pos_dxf"])
+                if d2 >= 400:
+                    continue
+                if best_id is None or d2 < best_d2:
+                    best_id, best_d2 = iid, d2
+            if best_id is not None:
+                potential_candidate[i] = best_id
+    else:
+        for iid, element in elements.items():
+            if "Schaltkreis" in element["name"]:
+                continue
+            for i in items:
+                candidate = elements[i]
+                if element["layer"] in candidate["layer"] and _d2(element["pos_dxf"], candidate["pos_dxf"]) < 400:
+                    if i in potential_candidate:
+                        if _d2(element["pos_dxf"], candidate["pos_dxf"]) < _d2(candidate["pos_dxf"], elements[potential_candidate[i]]["pos_dxf"]):
+                            potential_candidate[i] = iid
+                    else:
                         potential_candidate[i] = iid
-                else:
-                    potential_candidate[i] = iid
     for i in items:
         if i not in potential_candidate:
             print("CHKA: ", elements[i])
@@ -578,9 +816,8 @@ def main():
     layer_table = load_layer_colors(doc)
     #print("layer_table: ", layer_table)
 
-    # Collect base
-    base_texts = collect_texts(msp, layer_table, M)
-    items      = collect_items(msp, layer_table, M)
+    # Collect base: texts + insert elements in a single modelspace pass
+    base_texts, items = collect_all(msp, layer_table, M)
     #for i, v in items.items():
     #    print('item:', i, v)
     #exit(0)
@@ -594,10 +831,18 @@ def main():
     elements = assign_chessboard_and_position(items_with_groups, LAYOUTS_X,  LAYOUTS_Y)
     #print('elements posle:', elements)
     #print('proned_txt: ', proned_txt)
-    with open("extracted_elements.json", "w", encoding="utf-8") as f:
-        json.dump(elements, f, ensure_ascii=False, indent=2)
-    with open("extracted_txt.json", "w", encoding="utf-8") as f:
-        json.dump(proned_txt, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        # default=list covers the rgb/pos tuples orjson won't serialize natively
+        opts = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        with open("extracted_elements.json", "wb") as f:
+            f.write(orjson.dumps(elements, option=opts, default=list))
+        with open("extracted_txt.json", "wb") as f:
+            f.write(orjson.dumps(proned_txt, option=opts, default=list))
+    else:
+        with open("extracted_elements.json", "w", encoding="utf-8") as f:
+            json.dump(elements, f, ensure_ascii=False, indent=2)
+        with open("extracted_txt.json", "w", encoding="utf-8") as f:
+            json.dump(proned_txt, f, ensure_ascii=False, indent=2)
 
 
 if __name__=="__main__":
@@ -1,4 +1,3 @@
-import itertools
 import ezdxf
 from collections import Counter
 
@@ -9,20 +8,30 @@ doc = ezdxf.readfile("out/MEL_5152_EG_ELT.dxf")
 msp = doc.modelspace()
 
 print(doc.dxfversion)
-print("TEXT:", len(msp.query("TEXT")))
-print("MTEXT:", len(msp.query("MTEXT")))
-print("INSERT:", len(msp.query("INSERT")))
+
+# one modelspace walk instead of a fresh query() scan per entity type
+texts, mtexts, inserts = [], [], []
+for e in msp:
+    t = e.dxftype()
+    if t == "INSERT":
+        inserts.append(e)
+    elif t == "TEXT":
+        texts.append(e)
+    elif t == "MTEXT":
+        mtexts.append(e)
+
+print("TEXT:", len(texts))
+print("MTEXT:", len(mtexts))
+print("INSERT:", len(inserts))
 
 # sample 40 block names
-ins_q = msp.query("INSERT")
-sample_names = {e.dxf.name for e in itertools.islice(ins_q, 40)}
+sample_names = {e.dxf.name for e in inserts[:40]}
 print("Sample block names:", sorted(sample_names))
 
 # top layers for INSERTs (first 10k only to keep it fast)
-layer_counts = Counter(e.dxf.layer for e in itertools.islice(msp.query("INSERT"), 10_000))
+layer_counts = Counter(e.dxf.layer for e in inserts[:10_000])
 print("Top INSERT layers:", layer_counts.most_common(15))
 
 # peek a few MTEXT strings
-for e in itertools.islice(msp.query("MTEXT"), 8):
+for e in mtexts[:8]:
     print(repr(e.plain_text()), e.dxf.layer, tuple(e.dxf.insert))
-